@@ -3,6 +3,7 @@ from src.scheduler import TimetableScheduler
 from src.data.mock_user_input import mock_user_input
 from src.process_data import preprocess_module
 from src.scheduler_new import SchedulerMIP
+from src.compatibility import ModuleCompatibilityIndex
 #from src.scheduler import TimetableScheduler
 
 if __name__ == "__main__":
@@ -22,6 +23,9 @@ if __name__ == "__main__":
         result = preprocess_module(module_code, module_raw, semester=mock_user_input["semester"])
         preprocessed_modules[module_code] = result[module_code]  # Only the value part
 
+    # Step 2b: Precompute pairwise clash relations to skip impossible subsets
+    compat_index = ModuleCompatibilityIndex.build(preprocessed_modules)
+
     # Step 3: Find optimal subset of N modules with best schedule
     #best_schedule, selected_modules = TimetableScheduler.find_best_module_combination(
     #    preprocessed_modules=preprocessed_modules,
@@ -35,9 +39,13 @@ if __name__ == "__main__":
         preprocessed_modules=preprocessed_modules,
         compulsory=mock_user_input["compulsory"],
         optional=mock_user_input["optional"],
-        N=mock_user_input["N"]
+        N=mock_user_input["N"],
+        compat_index=compat_index
     )
     best_schedule, selected_modules = scheduler.find_best_schedule()
+    stats = scheduler.propagation_stats
+    print(f"\n🔧 Propagation removed {stats['eliminated']}/{stats['groups_before']} lesson groups of the selected modules, "
+          f"ruled out {stats['pruned_subsets']} subsets before solving")
 
     # Step 4: Display result
     if best_schedule:
@@ -0,0 +1,126 @@
+from itertools import combinations
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+MINUTES_PER_DAY = 24 * 60
+
+ALWAYS_CLASHES = "always"
+SOMETIMES_CLASHES = "sometimes"
+COMPATIBLE = "compatible"
+
+def time_to_minutes(t):
+    return int(t[:2]) * 60 + int(t[2:])
+
+def lesson_mask(lesson):
+    """
+    Encodes a lesson as a bitmask over the week, one bit per minute.
+    Two lessons overlap exactly when their masks share a bit.
+    """
+    offset = DAYS.index(lesson['day']) * MINUTES_PER_DAY
+    start = offset + time_to_minutes(lesson['startTime'])
+    end = offset + time_to_minutes(lesson['endTime'])
+    return ((1 << (end - start)) - 1) << start
+
+def group_mask(group):
+    mask = 0
+    for lesson in group:
+        mask |= lesson_mask(lesson)
+    return mask
+
+def build_type_masks(data):
+    """Maps each lessonType with at least one group to the list of its group masks."""
+    type_masks = {}
+    for lt, groups in data['lessonTypes'].items():
+        if groups:
+            type_masks[lt] = [group_mask(g) for g in groups]
+    return type_masks
+
+class ModuleCompatibilityIndex:
+    """
+    Precomputed pairwise clash relations between preprocessed modules.
+
+    For every module we keep:
+      - a fixed mask: minutes occupied no matter which groups are picked
+      - a union mask: minutes occupied by at least one possible group
+      - the group masks of each lessonType
+
+    Two modules are COMPATIBLE if their union masks are disjoint, ALWAYS_CLASHES
+    if no choice of groups can avoid an overlap (detected per lessonType pair),
+    and SOMETIMES_CLASHES otherwise.
+    """
+
+    def __init__(self):
+        self.type_masks = {}
+        self.fixed_masks = {}
+        self.union_masks = {}
+        self.relations = {}
+        self.always_clashes = {}
+
+    @classmethod
+    def build(cls, preprocessed_modules):
+        index = cls()
+        for code, data in preprocessed_modules.items():
+            index._add_module(code, data)
+        return index
+
+    def _add_module(self, code, data):
+        type_masks = build_type_masks(data)
+        fixed = 0
+        union = 0
+        for masks in type_masks.values():
+            common = masks[0]
+            for m in masks[1:]:
+                common &= m
+            fixed |= common
+            for m in masks:
+                union |= m
+
+        self.type_masks[code] = type_masks
+        self.fixed_masks[code] = fixed
+        self.union_masks[code] = union
+        self.relations[code] = {}
+        self.always_clashes[code] = set()
+
+        for other in self.type_masks:
+            if other == code:
+                continue
+            rel = self._compute_relation(code, other)
+            self.relations[code][other] = rel
+            self.relations[other][code] = rel
+            if rel == ALWAYS_CLASHES:
+                self.always_clashes[code].add(other)
+                self.always_clashes[other].add(code)
+
+    def _compute_relation(self, a, b):
+        if not self.union_masks[a] & self.union_masks[b]:
+            return COMPATIBLE
+        if self.fixed_masks[a] & self.fixed_masks[b]:
+            return ALWAYS_CLASHES
+
+        # Some lessonType of one module has no group avoiding the other's fixed lessons
+        for x, y in ((a, b), (b, a)):
+            fixed = self.fixed_masks[y]
+            for masks in self.type_masks[x].values():
+                if all(m & fixed for m in masks):
+                    return ALWAYS_CLASHES
+
+        # Some pair of lessonTypes where every combination of groups overlaps
+        for masks_a in self.type_masks[a].values():
+            for masks_b in self.type_masks[b].values():
+                if all(ma & mb for ma in masks_a for mb in masks_b):
+                    return ALWAYS_CLASHES
+
+        return SOMETIMES_CLASHES
+
+    def can_coexist(self, codes):
+        """Returns False if any two of the given modules can never be taken together."""
+        for a, b in combinations(codes, 2):
+            if b in self.always_clashes[a]:
+                return False
+        return True
+
+    def addable(self, selected, candidates):
+        """Returns the candidates that do not always clash with any of the selected modules."""
+        return [
+            c for c in candidates
+            if c not in selected and not any(s in self.always_clashes[c] for s in selected)
+        ]
@@ -0,0 +1,100 @@
+from collections import defaultdict, deque
+
+try:
+    from src.compatibility import build_type_masks
+except ModuleNotFoundError:
+    # telegram_bot.py runs from inside src/
+    from compatibility import build_type_masks
+
+def propagate_domains(structured_modules):
+    """
+    Arc-consistency over lessonTypes of different modules, run before any solver.
+    A group is removed when every remaining group of some other module's lessonType
+    clashes with it; singleton domains therefore prune everything they clash with.
+    Repeats until nothing changes.
+
+    If a lessonType runs out of groups, 'culprits' lists every module on the chain
+    of removals that led there.
+
+    Returns a dict like:
+    {
+        'modules': { 'CS1010': {'lessonTypes': {...}} } or None if infeasible,
+        'culprits': ['CS1010', 'MA2001'],
+        'groups_before': 120,
+        'groups_after': 45,
+        'eliminated': 75
+    }
+    """
+    group_masks = {}
+    domains = {}
+    type_unions = {}
+    for code, data in structured_modules.items():
+        for lt, masks in build_type_masks(data).items():
+            group_masks[(code, lt)] = masks
+            domains[(code, lt)] = list(range(len(masks)))
+            union = 0
+            for m in masks:
+                union |= m
+            type_unions[(code, lt)] = union
+
+    variables = list(domains)
+    neighbours = {
+        v: [w for w in variables if w[0] != v[0] and type_unions[v] & type_unions[w]]
+        for v in variables
+    }
+    groups_before = sum(len(d) for d in domains.values())
+
+    # removed_by[v] holds every lessonType whose domain caused a removal from v
+    removed_by = defaultdict(set)
+    queue = deque((v, w) for v in variables for w in neighbours[v])
+    culprits = []
+    while queue:
+        v, w = queue.popleft()
+        masks_v = group_masks[v]
+        support = [group_masks[w][j] for j in domains[w]]
+        kept = [i for i in domains[v] if any(not masks_v[i] & m for m in support)]
+        if len(kept) == len(domains[v]):
+            continue
+        domains[v] = kept
+        removed_by[v].add(w)
+        if not kept:
+            culprits = explain_failure(v, removed_by)
+            break
+        for u in neighbours[v]:
+            if u != w:
+                queue.append((u, v))
+
+    groups_after = sum(len(d) for d in domains.values())
+    report = {
+        'modules': None,
+        'culprits': culprits,
+        'groups_before': groups_before,
+        'groups_after': groups_after,
+        'eliminated': groups_before - groups_after
+    }
+    if culprits:
+        return report
+
+    reduced = {}
+    for code, data in structured_modules.items():
+        lesson_types = {}
+        for lt, groups in data['lessonTypes'].items():
+            if (code, lt) in domains:
+                lesson_types[lt] = [groups[i] for i in domains[(code, lt)]]
+            else:
+                lesson_types[lt] = groups
+        reduced[code] = {'lessonTypes': lesson_types}
+    report['modules'] = reduced
+    return report
+
+def explain_failure(emptied, removed_by):
+    """Follows removal causes back from the emptied lessonType and returns the modules involved."""
+    seen = {emptied}
+    stack = [emptied]
+    while stack:
+        v = stack.pop()
+        for w in removed_by[v]:
+            if w not in seen:
+                seen.add(w)
+                stack.append(w)
+    return sorted({code for code, _ in seen})
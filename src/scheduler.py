@@ -2,13 +2,22 @@ from itertools import combinations, product
 from collections import defaultdict
 import concurrent.futures
 
+try:
+    from src.propagation import propagate_domains
+except ModuleNotFoundError:
+    # telegram_bot.py runs from inside src/
+    from propagation import propagate_domains
+
 def evaluate_subset(opt_subset, preprocessed_modules, compulsory):
     # Re-importing here avoids issues if you later refactor this into packages
-    scheduler = TimetableScheduler({m: preprocessed_modules[m] for m in compulsory + list(opt_subset)})
+    report = propagate_domains({m: preprocessed_modules[m] for m in compulsory + list(opt_subset)})
+    if report['modules'] is None:
+        return None, report
+    scheduler = TimetableScheduler(report['modules'])
     schedule = scheduler.find_best_schedule()
     if schedule is None:
-        return None
-    return scheduler.min_days, scheduler.min_total_minutes, schedule, compulsory + list(opt_subset)
+        return None, report
+    return (scheduler.min_days, scheduler.min_total_minutes, schedule, compulsory + list(opt_subset)), report
 
 class TimetableScheduler:
     def __init__(self, structured_modules):
@@ -83,8 +92,15 @@ class TimetableScheduler:
         return self.best_schedule
 
     @classmethod
-    def find_best_module_combination(cls, preprocessed_modules, compulsory, optional, N):
+    def find_best_module_combination(cls, preprocessed_modules, compulsory, optional, N,
+                                     compat_index=None, propagation_stats=None):
         subsets = list(combinations(optional, N - len(compulsory)))
+        if compat_index:
+            subsets = [s for s in subsets if compat_index.can_coexist(compulsory + list(s))]
+        # Group counts describe the returned subset; pruned_subsets counts subsets ruled out before solving
+        if propagation_stats is None:
+            propagation_stats = {}
+        propagation_stats.update({'groups_before': 0, 'groups_after': 0, 'eliminated': 0, 'pruned_subsets': 0})
         best_days = float('inf')
         best_span = float('inf')
         best_schedule = None
@@ -96,7 +112,9 @@ class TimetableScheduler:
                 for subset in subsets
             ]
             for future in concurrent.futures.as_completed(futures):
-                result = future.result()
+                result, report = future.result()
+                if report['modules'] is None:
+                    propagation_stats['pruned_subsets'] += 1
                 if result is None:
                     continue
                 days_used, span, schedule, modules = result
@@ -105,5 +123,7 @@ class TimetableScheduler:
                     best_span = span
                     best_schedule = schedule
                     best_modules = modules
+                    for key in ('groups_before', 'groups_after', 'eliminated'):
+                        propagation_stats[key] = report[key]
 
         return best_schedule, best_modules
@@ -3,12 +3,21 @@ from itertools import combinations
 from collections import defaultdict
 from pulp import LpStatus
 
+try:
+    from src.propagation import propagate_domains
+except ModuleNotFoundError:
+    # telegram_bot.py runs from inside src/
+    from propagation import propagate_domains
+
 class SchedulerMIP:
-    def __init__(self, preprocessed_modules, compulsory, optional, N):
+    def __init__(self, preprocessed_modules, compulsory, optional, N, compat_index=None):
         self.modules = preprocessed_modules
         self.compulsory = compulsory
         self.optional = optional
         self.N = N
+        self.compat_index = compat_index
+        # Group counts describe the returned subset; pruned_subsets counts subsets ruled out before solving
+        self.propagation_stats = {'groups_before': 0, 'groups_after': 0, 'eliminated': 0, 'pruned_subsets': 0}
 
     @staticmethod
     def time_to_minutes(t):
@@ -119,8 +128,15 @@ class SchedulerMIP:
     def find_best_schedule(self):
         for opt_subset in combinations(self.optional, self.N - len(self.compulsory)):
             chosen = self.compulsory + list(opt_subset)
-            subset = {m: self.modules[m] for m in chosen}
-            result = self.optimize_timetable(subset)
+            if self.compat_index and not self.compat_index.can_coexist(chosen):
+                continue
+            report = propagate_domains({m: self.modules[m] for m in chosen})
+            if report['modules'] is None:
+                self.propagation_stats['pruned_subsets'] += 1
+                continue
+            result = self.optimize_timetable(report['modules'])
             if result:
+                for key in ('groups_before', 'groups_after', 'eliminated'):
+                    self.propagation_stats[key] = report[key]
                 return result, chosen
         return None, None
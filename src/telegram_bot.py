@@ -16,6 +16,8 @@ from telegram.ext import (
 from fetcher import NUSModsAPI
 from process_data import preprocess_module
 from scheduler_new import SchedulerMIP
+from compatibility import ModuleCompatibilityIndex
+from propagation import propagate_domains
 import uuid
 from dotenv import load_dotenv
 from render_schedule import draw_timetable
@@ -104,8 +106,37 @@ async def ask_semester(update: Update, context: ContextTypes.DEFAULT_TYPE):
         processed = preprocess_module(code, raw_data[code], user_inputs['semester'])
         preprocessed[code] = processed[code]
 
-    scheduler = SchedulerMIP(preprocessed, user_inputs['compulsory'], user_inputs['optional'], user_inputs['N'])
+    compulsory_report = propagate_domains({m: preprocessed[m] for m in user_inputs['compulsory']})
+    if compulsory_report['modules'] is None:
+        await update.message.reply_text(
+            f"❌ Your compulsory modules always clash with each other: {', '.join(compulsory_report['culprits'])}"
+        )
+        return ConversationHandler.END
+    preprocessed.update(compulsory_report['modules'])
+
+    # Built per request from freshly fetched data so relations never go stale
+    compat_index = ModuleCompatibilityIndex.build(preprocessed)
+
+    addable = compat_index.addable(user_inputs['compulsory'], user_inputs['optional'])
+    clashing = [m for m in user_inputs['optional'] if m not in addable and m not in user_inputs['compulsory']]
+    if clashing:
+        await update.message.reply_text(
+            f"⚠️ These can never fit with your compulsory modules: {', '.join(clashing)}"
+        )
+
+    scheduler = SchedulerMIP(
+        preprocessed, user_inputs['compulsory'], addable, user_inputs['N'], compat_index=compat_index
+    )
     best_schedule, selected = scheduler.find_best_schedule()
+    stats = scheduler.propagation_stats
+    if best_schedule:
+        # Compulsory groups removed up front are part of the selected modules too
+        removed = compulsory_report['eliminated'] + stats['eliminated']
+        total = compulsory_report['eliminated'] + stats['groups_before']
+        await update.message.reply_text(
+            f"🔧 Pre-solve propagation removed {removed} of {total} lesson groups of the selected modules"
+            f" and ruled out {stats['pruned_subsets']} module combinations."
+        )
 
     if not best_schedule:
         await update.message.reply_text("❌ Could not find a valid timetable with your inputs.")